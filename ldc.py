@@ -1,8 +1,14 @@
 import os
 import json
+import mmap
+import time
 import hashlib
+import binascii
 import argparse
+import functools
+from operator import itemgetter
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 
 def load_ignored_file_types_list(json_file_path, key='ignored_file_types'):
@@ -19,142 +25,333 @@ def load_ignored_file_types_list(json_file_path, key='ignored_file_types'):
     return data[key]
 
 
+def split_ignored_file_types(entries):
+    """Split ignore entries into file names and `*.ext` extensions.
+
+    Entries of the form `*.ext` ignore every file with that extension,
+    compared case-insensitively; all other entries match exact names.
+    """
+    names = frozenset(entry for entry in entries if not entry.startswith('*.'))
+    # Keep the leading dot so extensions compare against os.path.splitext
+    extensions = frozenset(
+        entry[1:].lower() for entry in entries if entry.startswith('*.'))
+    return names, extensions
+
+
+# Known header that starts every manifest, used to detect a wrong password
+MANIFEST_HEADER = b'MANIFEST_HEADER'
+# Size of the chunks read when hashing a file
+READ_CHUNK_SIZE = 1 << 20
+# Files larger than this are memory-mapped and hashed in a single call
+MMAP_THRESHOLD = 16 << 20
+
+
 def compute_file_checksum(file_path):
-    """Compute SHA-256 checksum of a file."""
+    """Compute the raw SHA-256 digest of a file."""
     hash_sha256 = hashlib.sha256()
-    with open(file_path, 'rb') as f:
+    with open(file_path, 'rb', buffering=0) as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if file_size <= READ_CHUNK_SIZE:
+            # Small files are read and hashed in one go, which skips the
+            # per-file chunk buffer and read-ahead hint below
+            hash_sha256.update(f.readall())
+            return hash_sha256.digest()
+        if hasattr(os, 'posix_fadvise'):
+            # Ask the kernel to read ahead aggressively while we hash
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        if file_size > MMAP_THRESHOLD:
+            # Let the kernel page in large files while hashlib reads the mapping.
+            # A file truncated while mapped kills the process with SIGBUS
+            # instead of raising OSError like the chunked path below.
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, 'madvise'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                hash_sha256.update(mm)
+            return hash_sha256.digest()
+        # Reuse one buffer for every chunk to avoid allocating per read
+        buffer = bytearray(READ_CHUNK_SIZE)
+        view = memoryview(buffer)
         # Read and update hash in chunks to handle large files
-        for chunk in iter(lambda: f.read(4096), b''):
-            hash_sha256.update(chunk)
-    return hash_sha256.hexdigest()
+        while size := f.readinto(buffer):
+            hash_sha256.update(view[:size])
+    return hash_sha256.digest()
+
+
+def _walk_files(root, ignored_names, ignored_extensions):
+    """Yield `(absolute_path, relative_posix_path)` for every file under root."""
+    stack = [(root, '')]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            # Like Path.rglob, a missing or non-directory root yields nothing
+            continue
+        with entries:
+            for entry in entries:
+                # Symlinked directories are not followed, symlinked files are
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, f'{prefix}{entry.name}/'))
+                elif entry.is_file():
+                    name = entry.name
+                    if name in ignored_names:
+                        continue
+                    if os.path.splitext(name)[1].lower() in ignored_extensions:
+                        continue
+                    yield entry.path, prefix + name
+
+
+def _load_checksum_cache(cache_file):
+    """Load cached checksums keyed by relative path, or none if unreadable."""
+    try:
+        with open(cache_file, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
 
+def _cached_checksum(cached, signature):
+    """Return the digest of a cache entry matching `signature`, else None."""
+    # Malformed entries are treated as cache misses
+    if not isinstance(cached, list) or len(cached) != 5:
+        return None
+    if cached[:4] != signature:
+        return None
+    if not isinstance(cached[4], str) or len(cached[4]) != 64:
+        return None
+    try:
+        return binascii.a2b_hex(cached[4])
+    except ValueError:
+        return None
+
+
+def _save_checksum_cache(cache, cache_file):
+    """Save cached checksums keyed by relative path, ignoring write errors."""
+    # Like loading, saving the cache is best-effort and never fails the run
+    try:
+        with open(cache_file, 'w') as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
 
-def generate_checksums(root_dir):
-    """Generate checksums for all files in the directory tree."""
+
+def generate_checksums(root_dir, jobs=None, cache_file=None):
+    """Generate checksums for all files in the directory tree.
+
+    If `cache_file` is given, files whose device, inode, size and
+    modification time match the cache reuse their cached checksum instead
+    of being hashed again, and the cache is updated afterwards.
+    """
+    root_path = str(Path(root_dir).resolve())
     checksums = []
-    root_path = Path(root_dir).resolve()
-    for file_path in root_path.rglob('*'):
-        if file_path.is_file():
-            relative_path = file_path.relative_to(root_path)
-            if relative_path.name in IGNORED_FILES:
+    if cache_file:
+        cache_path = os.path.realpath(cache_file)
+        old_cache = _load_checksum_cache(cache_file)
+        new_cache = {}
+        signatures = {}
+        # Files modified this recently may change again within the same
+        # timestamp tick, so their checksums are not cached
+        racy_cutoff = time.time_ns() - 2_000_000_000
+    # Collect the files first so they can be hashed concurrently
+    file_paths = []
+    normalized_paths = []
+    for file_path, normalized_path in _walk_files(
+            root_path, IGNORED_FILES, IGNORED_EXTENSIONS):
+        if cache_file:
+            if file_path == cache_path:
                 continue
-            file_checksum = compute_file_checksum(file_path)
-            # Normalize the relative path to use forward slashes
-            normalized_path = relative_path.as_posix()
-            checksums.append((normalized_path, file_checksum))
-    # Sort the list to ensure consistent order
-    checksums.sort()
+            st = os.stat(file_path)
+            signature = [st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns]
+            cached = old_cache.get(normalized_path)
+            cached_checksum = _cached_checksum(cached, signature)
+            if cached_checksum is not None:
+                checksums.append((normalized_path, cached_checksum))
+                new_cache[normalized_path] = cached
+                continue
+            signatures[normalized_path] = signature
+        file_paths.append(file_path)
+        normalized_paths.append(normalized_path)
+    if jobs is None:
+        jobs = os.cpu_count()
+    # hashlib releases the GIL while hashing, so threads run in parallel
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        file_checksums = executor.map(compute_file_checksum, file_paths)
+        checksums.extend(zip(normalized_paths, file_checksums))
+    if cache_file:
+        for normalized_path, file_checksum in checksums:
+            signature = signatures.get(normalized_path)
+            if signature and signature[3] < racy_cutoff:
+                new_cache[normalized_path] = signature + [
+                    binascii.b2a_hex(file_checksum).decode('ascii')]
+        _save_checksum_cache(new_cache, cache_file)
+    # Sort by path to ensure consistent order; paths are unique, so the
+    # checksums never need to be compared
+    checksums.sort(key=itemgetter(0))
     return checksums
 
 
+@functools.lru_cache(maxsize=8)
+def _derive_key(password):
+    """Derive the XOR key from the password, reusing previous derivations."""
+    return hashlib.sha256(password.encode('utf-8')).digest()
+
+
+def _xor_with_key(content, key):
+    """XOR content with a repeating key."""
+    length = len(content)
+    # Repeat the key over the content length and XOR both as big integers,
+    # which runs the whole operation in C instead of byte by byte
+    keystream = (key * (length // len(key) + 1))[:length]
+    # Rebind the name so the repeated key bytes are freed before the content
+    # is converted, and drop the keystream before the result is encoded
+    keystream = int.from_bytes(keystream, 'little')
+    encrypted = int.from_bytes(content, 'little') ^ keystream
+    del keystream
+    return encrypted.to_bytes(length, 'little')
+
+
 def simple_encrypt_decrypt(content, password):
-    """Encrypt or decrypt content using a simple XOR cipher."""
-    key = hashlib.sha256(password.encode('utf-8')).digest()
-    encrypted = bytearray()
-    for i in range(len(content)):
-        encrypted.append(content[i] ^ key[i % len(key)])
-    return bytes(encrypted)
+    """Encrypt or decrypt content using a simple XOR cipher.
+
+    This only obfuscates the manifest; it offers no confidentiality or
+    integrity guarantees against someone who wants to read or alter it.
+    """
+    return _xor_with_key(content, _derive_key(password))
+
+
+def _build_manifest(checksums):
+    """Serialize checksums to manifest bytes and return them with their hash."""
+    encoded_paths = [path.encode('utf-8') for path, _ in checksums]
+    # Every line is a 64-character digest, two spaces and the path, and lines
+    # are separated, not terminated, by newlines
+    total_size = (len(MANIFEST_HEADER) + max(len(checksums) - 1, 0) +
+                  sum(66 + len(encoded_path) for encoded_path in encoded_paths))
+    manifest = bytearray(total_size)
+    # Add a known header to the manifest content
+    manifest[:len(MANIFEST_HEADER)] = MANIFEST_HEADER
+    position = len(MANIFEST_HEADER)
+    for (_, checksum), encoded_path in zip(checksums, encoded_paths):
+        if position > len(MANIFEST_HEADER):
+            manifest[position] = 0x0a
+            position += 1
+        manifest[position:position + 64] = binascii.b2a_hex(checksum)
+        manifest[position + 64:position + 66] = b'  '
+        end = position + 66 + len(encoded_path)
+        manifest[position + 66:end] = encoded_path
+        position = end
+    # The hash of the manifest content is used for the filename
+    return manifest, hashlib.sha256(manifest).hexdigest()
+
+
+def _write_manifest_file(manifest_filename, content):
+    """Write manifest bytes straight to a file descriptor."""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    # Let the umask decide the permissions, as open() does
+    fd = os.open(manifest_filename, flags, 0o666)
+    try:
+        view = memoryview(content)
+        written = 0
+        # os.write may write fewer bytes than requested
+        while written < len(view):
+            written += os.write(fd, view[written:])
+    finally:
+        os.close(fd)
 
 
 def save_manifest_encrypted(checksums, password, output_path=None):
     """Save the per-file checksums to an encrypted manifest file."""
-    manifest_content = '\n'.join(
-        f'{checksum}  {path}' for path, checksum in checksums)
-    # Add a known header to the manifest content
-    manifest_content = 'MANIFEST_HEADER' + manifest_content
-    manifest_bytes = manifest_content.encode('utf-8')
+    manifest_bytes, manifest_hash = _build_manifest(checksums)
     encrypted_manifest = simple_encrypt_decrypt(manifest_bytes, password)
-    # Compute the hash of the manifest content for the filename
-    manifest_hash = hashlib.sha256(manifest_bytes).hexdigest()
     manifest_filename = f'{manifest_hash}.comparator'
     #  if output_path is not provided
     if output_path:
         # `output_path` is always a directory
         manifest_filename = os.path.join(output_path, manifest_filename)
-    with open(manifest_filename, 'wb') as f:
-        f.write(encrypted_manifest)
+    _write_manifest_file(manifest_filename, encrypted_manifest)
     return manifest_filename
 
 
+def _parse_manifest(manifest_content):
+    """Parse manifest bytes, starting with the header, into checksums."""
+    checksums = []
+    lines = manifest_content.split(b'\n')
+    # Strip the header from the first line rather than copying the whole
+    # content without it
+    lines[0] = lines[0][len(MANIFEST_HEADER):]
+    for line in lines:
+        # Tolerate manifests written with Windows line endings
+        if line.endswith(b'\r'):
+            line = line[:-1]
+        if not line:
+            continue
+        # Each line is a 64-character hex digest, two spaces and the path
+        if line[64:66] != b'  ':
+            raise ValueError('Invalid manifest file format.')
+        try:
+            checksums.append(
+                (line[66:].decode('utf-8'), binascii.a2b_hex(line[:64])))
+        except ValueError as e:
+            raise ValueError('Invalid manifest file format.') from e
+    return checksums
+
+
 def load_manifest_encrypted(manifest_file, password):
     """Load and decrypt checksums from an encrypted manifest file."""
     with open(manifest_file, 'rb') as f:
         encrypted_content = f.read()
     decrypted_content = simple_encrypt_decrypt(encrypted_content, password)
+    # Verify the header
+    if not decrypted_content.startswith(MANIFEST_HEADER):
+        raise ValueError('Incorrect password or corrupted manifest file.')
     try:
-        manifest_text = decrypted_content.decode('utf-8')
-        # Verify the header
-        if not manifest_text.startswith('MANIFEST_HEADER'):
-            raise ValueError('Incorrect password or corrupted manifest file.')
-        # Remove the header before processing
-        manifest_text = manifest_text[len('MANIFEST_HEADER'):]
-    except (UnicodeDecodeError, ValueError) as e:
+        return _parse_manifest(decrypted_content)
+    except ValueError as e:
         raise ValueError(
             'Incorrect password or corrupted manifest file.') from e
-    checksums = []
-    for line in manifest_text.strip().split('\n'):
-        checksum, path = line.strip().split('  ', 1)
-        checksums.append((path, checksum))
-    return checksums
 
 
 def load_manifest(manifest_file):
     """Load checksums from an unencrypted manifest file."""
-    with open(manifest_file, 'r') as f:
-        manifest_text = f.read()
+    with open(manifest_file, 'rb') as f:
+        manifest_content = f.read()
     # Verify the header
-    if not manifest_text.startswith('MANIFEST_HEADER'):
+    if not manifest_content.startswith(MANIFEST_HEADER):
         raise ValueError('Invalid manifest file format.')
-    # Remove the header before processing
-    manifest_text = manifest_text[len('MANIFEST_HEADER'):]
-    checksums = []
-    for line in manifest_text.strip().split('\n'):
-        checksum, path = line.strip().split('  ', 1)
-        checksums.append((path, checksum))
-    return checksums
+    return _parse_manifest(manifest_content)
 
 
 def save_manifest(checksums, output_path=None):
     """Save the per-file checksums to a manifest file without encryption."""
-    manifest_content = '\n'.join(
-        f'{checksum}  {path}' for path, checksum in checksums)
-    # Add a known header to the manifest content
-    manifest_content = 'MANIFEST_HEADER' + manifest_content
-    manifest_bytes = manifest_content.encode('utf-8')
-    # Compute the hash of the manifest content for the filename
-    manifest_hash = hashlib.sha256(manifest_bytes).hexdigest()
+    manifest_bytes, manifest_hash = _build_manifest(checksums)
     manifest_filename = f'{manifest_hash}.comparator'
     # If output_path is provided
     if output_path:
         manifest_filename = os.path.join(output_path, manifest_filename)
-    with open(manifest_filename, 'w') as f:
-        f.write(manifest_content)
+    # Write the exact bytes that were hashed for the filename
+    _write_manifest_file(manifest_filename, manifest_bytes)
     return manifest_filename
 
 
 def compare_manifests(manifest1, manifest2):
     """Compare two manifests and categorize differences."""
-    checksums1 = dict(manifest1)
     checksums2 = dict(manifest2)
-    all_keys = set(checksums1.keys()) | set(checksums2.keys())
-    added = []
     deleted = []
     modified = []
-    for key in all_keys:
-        checksum1 = checksums1.get(key)
-        checksum2 = checksums2.get(key)
-        if checksum1 != checksum2:
-            if checksum1 is None:
-                added.append(key)
-            elif checksum2 is None:
-                deleted.append(key)
-            else:
-                modified.append(key)
+    for key, checksum1 in manifest1:
+        # Whatever remains in `checksums2` afterwards was added
+        checksum2 = checksums2.pop(key, None)
+        if checksum2 is None:
+            deleted.append(key)
+        elif checksum1 != checksum2:
+            modified.append(key)
+    added = list(checksums2)
     return added, deleted, modified
 
 
 # Load the list of ignored files from the JSON file
-IGNORED_FILES = load_ignored_file_types_list('ignored_files.json')
+IGNORED_FILES, IGNORED_EXTENSIONS = split_ignored_file_types(
+    load_ignored_file_types_list('ignored_files.json'))
 
 
 def main():
@@ -171,6 +368,8 @@ def main():
         --debug (bool, optional): Run in debug mode (manifest is not encrypted).
         --output (str, optional): Path or filename to save the manifest.
         --compare (str, optional): Path to an existing manifest file to compare against.
+        --jobs (int, optional): Number of files to hash in parallel (defaults to the CPU count).
+        --cache (str, optional): Cache file used to skip re-hashing unchanged files between runs.
     """
     parser = argparse.ArgumentParser(description='Compute directory checksum.')
     parser.add_argument(
@@ -183,6 +382,11 @@ def main():
         '--output', help='Specify the output file path for the manifest (only when not comparing).')
     parser.add_argument(
         '--compare', help='Compare directory with an existing manifest file.')
+    parser.add_argument(
+        '--jobs', type=int,
+        help='Number of files to hash in parallel (defaults to the CPU count).')
+    parser.add_argument(
+        '--cache', help='Cache file used to skip re-hashing unchanged files between runs.')
     args = parser.parse_args()
 
     # Validate that --password is required unless --debug is set
@@ -198,10 +402,15 @@ def main():
         parser.error(
             "The '--output' argument cannot be used together with '--compare'.")
 
+    # Validate that --jobs is a positive number
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("The '--jobs' argument must be at least 1.")
+
     try:
         # Generate checksums of the current directory
         print(f'Generating checksums for directory: {args.directory}...')
-        checksums = generate_checksums(args.directory)
+        checksums = generate_checksums(
+            args.directory, args.jobs, args.cache)
         # Save the manifest if not comparing
         if not args.compare:
             if args.debug:
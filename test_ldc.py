@@ -1,10 +1,23 @@
 import unittest
 import os
+import io
+import contextlib
+import json
+import hashlib
+import shutil
+import tempfile
+from unittest import mock
+import ldc
 from ldc import (
+    compute_file_checksum,
     generate_checksums,
     save_manifest_encrypted,
     load_manifest_encrypted,
+    save_manifest,
+    load_manifest,
     compare_manifests,
+    simple_encrypt_decrypt,
+    split_ignored_file_types,
 )
 
 class TestLDC(unittest.TestCase):
@@ -17,6 +30,9 @@ class TestLDC(unittest.TestCase):
         setUp(self):
             Sets up the test environment by defining test directories and passwords used in the tests.
 
+        test_compute_file_checksum_read_paths(self):
+            Tests that small, chunked and memory-mapped reads all produce the SHA-256 digest of the file.
+
         test_generate_checksums_folder_a(self):
             Tests that the generate_checksums function correctly computes the checksum for files in 'test_folder_a'.
 
@@ -26,9 +42,45 @@ class TestLDC(unittest.TestCase):
         test_generate_checksums_folder_c(self):
             Tests that the generate_checksums function correctly computes checksums for files in 'test_folder_c'.
 
+        test_generate_checksums_missing_directory(self):
+            Tests that a missing or non-directory root yields no checksums.
+
+        test_split_ignored_file_types(self):
+            Tests that ignore entries are split into exact names and lower-cased `*.ext` extensions.
+
+        test_generate_checksums_skips_ignored_files(self):
+            Tests that files listed in the ignore list, by name or by `*.ext` pattern, are not checksummed.
+
+        test_generate_checksums_with_cache(self):
+            Tests that cached checksums are reused for unchanged files and refreshed for modified ones.
+
+        test_generate_checksums_with_corrupted_cache(self):
+            Tests that malformed cache entries are treated as cache misses.
+
+        test_generate_checksums_with_unwritable_cache(self):
+            Tests that failing to write the cache file does not fail checksum generation.
+
         test_save_and_load_manifest(self):
             Tests the ability to save a manifest file with encryption and then load it correctly.
 
+        test_save_manifest_format(self):
+            Tests that saved manifests match the exact bytes and filenames of the established manifest format.
+
+        test_save_and_load_manifest_unencrypted(self):
+            Tests the ability to save a manifest file without encryption and then load it correctly.
+
+        test_load_manifest_line_endings(self):
+            Tests that CR-terminated lines are accepted and empty lines are skipped when loading a manifest.
+
+        test_load_manifest_malformed_lines(self):
+            Tests that malformed or non-hex manifest lines raise 'Invalid manifest file format.'.
+
+        test_load_manifest_encrypted_malformed_lines(self):
+            Tests that malformed or non-hex lines in an encrypted manifest are reported as a corrupted manifest.
+
+        test_main_jobs_argument(self):
+            Tests that `--jobs` is passed on to generate_checksums and that values below 1 are rejected.
+
         test_compare_manifests_added_file(self):
             Tests that `compare_manifests` correctly identifies files that have been added between two manifests.
 
@@ -46,6 +98,21 @@ class TestLDC(unittest.TestCase):
         self.folder_c = os.path.join(self.test_dir, 'test_folder_c')
         self.password = 'testpassword'
 
+    def test_compute_file_checksum_read_paths(self):
+        """Tests that small, chunked and memory-mapped reads all produce the SHA-256 digest of the file."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        # Shrink the limits so each read path is taken by a small file
+        with mock.patch('ldc.READ_CHUNK_SIZE', 16), \
+                mock.patch('ldc.MMAP_THRESHOLD', 64):
+            for size in (0, 10, 16, 17, 40, 64, 65, 200):
+                data = os.urandom(size)
+                file_path = os.path.join(temp_dir, f'{size}.bin')
+                with open(file_path, 'wb') as f:
+                    f.write(data)
+                self.assertEqual(compute_file_checksum(file_path),
+                                 hashlib.sha256(data).digest())
+
     def test_generate_checksums_folder_a(self):
         """Tests that the generate_checksums function correctly computes the checksum for files in 'test_folder_a'."""
         checksums = generate_checksums(self.folder_a)
@@ -65,6 +132,82 @@ class TestLDC(unittest.TestCase):
         paths = set(path for path, _ in checksums)
         self.assertSetEqual(paths, {'a.txt', 'b.txt'})
 
+    def test_generate_checksums_missing_directory(self):
+        """Tests that a missing or non-directory root yields no checksums."""
+        self.assertEqual(
+            generate_checksums(os.path.join(self.test_dir, 'missing')), [])
+        self.assertEqual(
+            generate_checksums(os.path.join(self.folder_a, 'a.txt')), [])
+
+    def test_split_ignored_file_types(self):
+        """Tests that ignore entries are split into exact names and lower-cased `*.ext` extensions."""
+        names, extensions = split_ignored_file_types(['.DS_Store', '*.TMP'])
+        self.assertEqual(names, frozenset({'.DS_Store'}))
+        self.assertEqual(extensions, frozenset({'.tmp'}))
+
+    def test_generate_checksums_skips_ignored_files(self):
+        """Tests that files listed in the ignore list, by name or by `*.ext` pattern, are not checksummed."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        for name in ('a.txt', '.DS_Store', 'scratch.TMP'):
+            with open(os.path.join(temp_dir, name), 'w') as f:
+                f.write(name)
+        names, extensions = split_ignored_file_types(['.DS_Store', '*.TMP'])
+        with mock.patch('ldc.IGNORED_FILES', names), \
+                mock.patch('ldc.IGNORED_EXTENSIONS', extensions):
+            checksums = generate_checksums(temp_dir)
+        self.assertEqual([path for path, _ in checksums], ['a.txt'])
+
+    def test_generate_checksums_with_cache(self):
+        """Tests that cached checksums are reused for unchanged files and refreshed for modified ones."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        data_dir = os.path.join(temp_dir, 'data')
+        shutil.copytree(self.folder_c, data_dir)
+        # Backdate the files so they are old enough to be cached
+        for name in os.listdir(data_dir):
+            os.utime(os.path.join(data_dir, name), (0, 0))
+        cache_file = os.path.join(temp_dir, 'cache.json')
+        checksums = generate_checksums(data_dir, cache_file=cache_file)
+        self.assertTrue(os.path.exists(cache_file))
+        with mock.patch('ldc.compute_file_checksum') as compute:
+            self.assertEqual(
+                generate_checksums(data_dir, cache_file=cache_file), checksums)
+            compute.assert_not_called()
+        with open(os.path.join(data_dir, 'b.txt'), 'a') as f:
+            f.write('changed')
+        self.assertEqual(
+            generate_checksums(data_dir, cache_file=cache_file),
+            generate_checksums(data_dir))
+        self.assertNotEqual(
+            generate_checksums(data_dir, cache_file=cache_file), checksums)
+
+    def test_generate_checksums_with_corrupted_cache(self):
+        """Tests that malformed cache entries are treated as cache misses."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        cache_file = os.path.join(temp_dir, 'cache.json')
+        st = os.stat(os.path.join(self.folder_c, 'b.txt'))
+        signature = [st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns]
+        with open(cache_file, 'w') as f:
+            json.dump({
+                'a.txt': [1, 2, 3, 4],
+                'b.txt': signature + ['not a hex digest'.ljust(64, 'z')],
+            }, f)
+        self.assertEqual(
+            generate_checksums(self.folder_c, cache_file=cache_file),
+            generate_checksums(self.folder_c))
+
+    def test_generate_checksums_with_unwritable_cache(self):
+        """Tests that failing to write the cache file does not fail checksum generation."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        cache_file = os.path.join(temp_dir, 'missing', 'cache.json')
+        self.assertEqual(
+            generate_checksums(self.folder_c, cache_file=cache_file),
+            generate_checksums(self.folder_c))
+        self.assertFalse(os.path.exists(cache_file))
+
     def test_save_and_load_manifest(self):
         """Tests the ability to save a manifest file with encryption and then load it correctly."""
         checksums = generate_checksums(self.folder_a)
@@ -74,6 +217,118 @@ class TestLDC(unittest.TestCase):
         self.assertEqual(checksums, loaded_checksums)
         os.remove(manifest_filename)
 
+    def test_save_manifest_format(self):
+        """Tests that saved manifests match the exact bytes and filenames of the established manifest format."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        checksums = [
+            ('a.txt', hashlib.sha256(b'a').digest()),
+            ('sub/\u00f1.txt', hashlib.sha256(b'b').digest()),
+        ]
+        # Manifests written by earlier versions must stay loadable, so the
+        # expected output is pinned rather than only round-tripped
+        expected_filename = (
+            '56998417ec258530c26bb02738435852e2583eb05248b3d58435ef4a3d137ffb'
+            '.comparator')
+        expected_plain = (
+            b'MANIFEST_HEADER'
+            b'ca978112ca1bbdcafac231b39a23dc4da786eff8147c4e72b9807785afee48bb'
+            b'  a.txt\n'
+            b'3e23e8160039594a33894f6564e1b1348bbd7a0088d42c4acb73eeaed59c009d'
+            b'  sub/\xc3\xb1.txt')
+        expected_encrypted = bytes.fromhex(
+            'd2321044bfe48e935df74f5b3fc6515cfe4864983d18ece1afebbefb334bfa63'
+            'fe106c3ec8c3eefe638d397e18b7675ea84965c56a4fe6b3faedbfad321fa967'
+            'a64b6e3ace99e8a664da6f2e43e1611fbf107dd4745dd4b1abe8effc6f19ad35'
+            'af406738c095bcf43187332e1db53609ab1462c23d1aeabaacb8b8ae3618ab3d'
+            'a7176a3f9a95bca46088397f1ee2665baa4830903c10baa2eea9a9fb78eb2a2b'
+            'eb0b2a')
+        manifest_filename = save_manifest(checksums, temp_dir)
+        self.assertEqual(os.path.basename(manifest_filename), expected_filename)
+        with open(manifest_filename, 'rb') as f:
+            self.assertEqual(f.read(), expected_plain)
+        self.assertEqual(load_manifest(manifest_filename), checksums)
+        os.remove(manifest_filename)
+        manifest_filename = save_manifest_encrypted(
+            checksums, self.password, temp_dir)
+        self.assertEqual(os.path.basename(manifest_filename), expected_filename)
+        with open(manifest_filename, 'rb') as f:
+            self.assertEqual(f.read(), expected_encrypted)
+        self.assertEqual(
+            load_manifest_encrypted(manifest_filename, self.password), checksums)
+        os.remove(manifest_filename)
+        manifest_filename = save_manifest([], temp_dir)
+        self.assertEqual(
+            os.path.basename(manifest_filename),
+            'e7907b6c6ef7fd570963715332e40d2deee446f8b9e66fb57c9c2c26701f527d'
+            '.comparator')
+        with open(manifest_filename, 'rb') as f:
+            self.assertEqual(f.read(), b'MANIFEST_HEADER')
+
+    def test_save_and_load_manifest_unencrypted(self):
+        """Tests the ability to save a manifest file without encryption and then load it correctly."""
+        checksums = generate_checksums(self.folder_c)
+        manifest_filename = save_manifest(checksums)
+        self.assertTrue(os.path.exists(manifest_filename))
+        loaded_checksums = load_manifest(manifest_filename)
+        self.assertEqual(checksums, loaded_checksums)
+        os.remove(manifest_filename)
+
+    def _write_temp_manifest(self, content):
+        """Writes raw manifest bytes to a temporary file and returns its path."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        manifest_filename = os.path.join(temp_dir, 'manifest.comparator')
+        with open(manifest_filename, 'wb') as f:
+            f.write(content)
+        return manifest_filename
+
+    def test_load_manifest_line_endings(self):
+        """Tests that CR-terminated lines are accepted and empty lines are skipped when loading a manifest."""
+        digest_a = hashlib.sha256(b'a').digest()
+        digest_b = hashlib.sha256(b'b').digest()
+        content = (b'MANIFEST_HEADER' + digest_a.hex().encode() + b'  a.txt\r\n'
+                   + b'\n' + digest_b.hex().encode() + b'  sub/b.txt\r\n')
+        manifest_filename = self._write_temp_manifest(content)
+        self.assertEqual(load_manifest(manifest_filename),
+                         [('a.txt', digest_a), ('sub/b.txt', digest_b)])
+
+    def test_load_manifest_malformed_lines(self):
+        """Tests that malformed or non-hex manifest lines raise 'Invalid manifest file format.'."""
+        for line in (b'not a manifest line', b'z' * 64 + b'  a.txt'):
+            manifest_filename = self._write_temp_manifest(
+                b'MANIFEST_HEADER' + line)
+            with self.assertRaisesRegex(
+                    ValueError, r'^Invalid manifest file format\.$'):
+                load_manifest(manifest_filename)
+
+    def test_load_manifest_encrypted_malformed_lines(self):
+        """Tests that malformed or non-hex lines in an encrypted manifest are reported as a corrupted manifest."""
+        for line in (b'not a manifest line', b'z' * 64 + b'  a.txt'):
+            manifest_filename = self._write_temp_manifest(
+                simple_encrypt_decrypt(b'MANIFEST_HEADER' + line, self.password))
+            with self.assertRaisesRegex(
+                    ValueError,
+                    r'^Incorrect password or corrupted manifest file\.$'):
+                load_manifest_encrypted(manifest_filename, self.password)
+
+    def test_main_jobs_argument(self):
+        """Tests that `--jobs` is passed on to generate_checksums and that values below 1 are rejected."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        argv = ['ldc.py', self.folder_c, '--debug', '--output', temp_dir]
+        with mock.patch('sys.argv', argv + ['--jobs', '2']), \
+                mock.patch('ldc.generate_checksums',
+                           wraps=generate_checksums) as generate, \
+                contextlib.redirect_stdout(io.StringIO()):
+            ldc.main()
+        generate.assert_called_once_with(self.folder_c, 2, None)
+        self.assertEqual(len(os.listdir(temp_dir)), 1)
+        with mock.patch('sys.argv', argv + ['--jobs', '0']), \
+                contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                ldc.main()
+
     def test_compare_manifests_added_file(self):
         """Tests that `compare_manifests` correctly identifies files that have been added between two manifests."""
         checksums_a = generate_checksums(self.folder_a)